@@ -1,6 +1,7 @@
 from flask import Flask, render_template, request, jsonify, redirect, url_for, send_file
 import pandas as pd
 import os
+import match_archive
 import json
 from reportlab.lib.pagesizes import A4, landscape
 from reportlab.lib import colors
@@ -62,15 +63,19 @@ def generate_group_leaderboard(group):
     if not files:
         return None
 
-    # Combine all match data
-    all_matches = pd.concat([pd.read_csv(os.path.join(folder, f)) for f in files])
-    
-    # Aggregate data by Team
-    leaderboard = all_matches.groupby('Team').agg({
-        'WWCD': 'sum',
-        'PLCT': 'sum',
-        'Kills': 'sum'
-    }).reset_index()
+    if match_archive.exists(folder):
+        # Sum straight from the memory-mapped archive columns
+        leaderboard = match_archive.team_totals(folder, files)
+    else:
+        # Combine all match data
+        all_matches = pd.concat([pd.read_csv(os.path.join(folder, f)) for f in files])
+        
+        # Aggregate data by Team
+        leaderboard = all_matches.groupby('Team').agg({
+            'WWCD': 'sum',
+            'PLCT': 'sum',
+            'Kills': 'sum'
+        }).reset_index()
 
     # Calculate Total
     leaderboard['TOTAL'] = leaderboard['PLCT'] + leaderboard['Kills']
@@ -144,6 +149,8 @@ def save_match():
     df = pd.DataFrame(teams_data)
     filepath = os.path.join(folder, f"group_{group}_match_{match_no}.csv")
     df.to_csv(filepath, index=False)
+    if match_archive.exists(folder):
+        match_archive.append_match(folder, os.path.basename(filepath))
     
     return jsonify({'success': True, 'message': f'Match {match_no} saved successfully!', 'match_no': match_no})
 
@@ -0,0 +1,107 @@
+import argparse
+import multiprocessing
+import os
+import random
+import resource
+import shutil
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+import match_archive
+from table import POINT_SYSTEM, GROUP_A_TEAMS
+
+# Compares leaderboard aggregation over match CSVs against the columnar archive.
+# Each path runs in a fresh process and memory is that process's peak RSS,
+# which includes pages of the memory-mapped columns the OS reads in. The
+# BASELINE column is the peak RSS of a process that only does the imports.
+# Needs the resource module (Linux/macOS).
+
+def write_matches(folder, group, count):
+    """Writes `count` random match CSVs for a group"""
+    header = "Group,Team,Rank,Kills,WWCD,PLCT\n"
+    for match_no in range(1, count + 1):
+        teams = random.sample(GROUP_A_TEAMS, len(GROUP_A_TEAMS))
+        lines = [header]
+        for rank, team in enumerate(teams, 1):
+            lines.append(f"{group},{team},{rank},{random.randint(0, 15)},{1 if rank == 1 else 0},{POINT_SYSTEM.get(rank, 0)}\n")
+        with open(os.path.join(folder, f"group_{group}_match_{match_no}.csv"), 'w') as f:
+            f.writelines(lines)
+
+def csv_totals(folder, files):
+    """The aggregation generate_group_leaderboard does without an archive"""
+    all_matches = pd.concat([pd.read_csv(os.path.join(folder, f)) for f in files])
+    return all_matches.groupby('Team').agg({
+        'WWCD': 'sum',
+        'PLCT': 'sum',
+        'Kills': 'sum'
+    }).reset_index()
+
+def _peak_rss_mib():
+    # ru_maxrss survives execve on Linux, so a spawned child would report the
+    # parent's peak; VmHWM belongs to the child's own address space
+    if os.path.exists('/proc/self/status'):
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('VmHWM:'):
+                    return int(line.split()[1]) / 1024
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in KiB on Linux and bytes on macOS
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+def _measure_child(func, folder, files):
+    start = time.perf_counter()
+    result = func(folder, files)
+    elapsed = time.perf_counter() - start
+    return result, elapsed, _peak_rss_mib()
+
+def baseline(folder, files):
+    """Does nothing, measures the imports alone"""
+    return None
+
+def measure(func, folder, files):
+    """Returns (result, seconds, peak RSS in MiB) for one call in a fresh process"""
+    context = multiprocessing.get_context('spawn')
+    with ProcessPoolExecutor(max_workers=1, mp_context=context) as executor:
+        return executor.submit(_measure_child, func, folder, files).result()
+
+def run(count, group='A'):
+    root = tempfile.mkdtemp(prefix='bgmi_bench_')
+    try:
+        folder = os.path.join(root, f"Group_{group}_Data")
+        os.makedirs(folder)
+        write_matches(folder, group, count)
+        files = [f for f in os.listdir(folder) if f.startswith(f'group_{group}_match_') and f.endswith('.csv')]
+
+        _, _, base_peak = measure(baseline, folder, files)
+        csv_result, csv_time, csv_peak = measure(csv_totals, folder, files)
+
+        start = time.perf_counter()
+        match_archive.migrate(folder, group)
+        migrate_time = time.perf_counter() - start
+
+        archive_result, archive_time, archive_peak = measure(match_archive.team_totals, folder, files)
+
+        pd.testing.assert_frame_equal(csv_result, archive_result)
+        return base_peak, csv_time, csv_peak, archive_time, archive_peak, migrate_time
+    finally:
+        shutil.rmtree(root)
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark CSV vs archive leaderboard aggregation")
+    parser.add_argument('sizes', nargs='*', type=int, default=[1000, 10000, 100000], help="Match counts to benchmark")
+    args = parser.parse_args()
+
+    random.seed(0)
+    print(f"{'MATCHES':<10} {'BASELINE':<10} {'CSV TIME':<10} {'CSV PEAK':<10} {'ARCHIVE TIME':<14} {'ARCHIVE PEAK':<14} {'MIGRATE':<10}")
+    print("-" * 85)
+    for count in args.sizes:
+        base_peak, csv_time, csv_peak, archive_time, archive_peak, migrate_time = run(count)
+        print(f"{count:<10} {base_peak:<10.1f} {csv_time:<10.3f} {csv_peak:<10.1f} {archive_time:<14.4f} {archive_peak:<14.1f} {migrate_time:<10.2f}")
+    print("\nTimes in seconds, peak memory is peak RSS in MiB")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,313 @@
+import argparse
+import json
+import os
+from contextlib import contextmanager
+
+import numpy as np
+import pandas as pd
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+# Columnar match archive stored next to the CSVs in Group_<X>_Data/archive/
+#
+#   team.bin, wwcd.bin, plct.bin, kills.bin  - one little-endian int32 per row
+#   teams.jsonl                              - JSON encoded team names, line number = team code
+#   matches.txt                              - "<csv file>,<size>,<mtime_ns>,<first row>,<end row>"
+#   archive.lock                             - guards writers against each other and readers
+#
+# The CSVs stay the source of truth. An archived match only counts while its
+# CSV is still listed and has the size and mtime recorded for it; otherwise
+# the CSV is read directly until it is archived again. Re-archiving a file
+# appends a new matches.txt line and the latest line for a file wins.
+#
+# Matches are archived from what read_csv gives back for the saved file, so
+# rows read_csv turns into a NaN team are left out just like groupby('Team')
+# does. A match whose WWCD/PLCT/Kills do not all parse as integers (e.g. a
+# blank kills box) is never archived and is always read from its CSV.
+#
+# Rows only count once their line is in matches.txt, so a save that stops
+# half way leaves the archive readable and the tail is dropped on next append.
+ARCHIVE_DIR = "archive"
+TEAMS_FILE = "teams.jsonl"
+INDEX_FILE = "matches.txt"
+LOCK_FILE = "archive.lock"
+COLUMNS = ['WWCD', 'PLCT', 'Kills']
+DTYPE = np.dtype('<i4')
+DTYPE_INFO = np.iinfo(DTYPE)
+
+# Number of CSVs parsed per append while migrating
+MIGRATE_CHUNK = 1000
+
+# Rows summed per np.bincount call, bounds its float64 copy of the weights
+SUM_CHUNK = 1 << 20
+
+def archive_path(folder):
+    """Path of the archive inside a group's data folder"""
+    return os.path.join(folder, ARCHIVE_DIR)
+
+def exists(folder):
+    """Check whether a group's data folder has been migrated to the archive"""
+    return os.path.exists(os.path.join(archive_path(folder), INDEX_FILE))
+
+def _column_path(path, column):
+    return os.path.join(path, f"{column.lower()}.bin")
+
+@contextmanager
+def _locked(path, exclusive=True):
+    """Holds the archive lock, shared for readers and exclusive for writers"""
+    lock_path = os.path.join(path, LOCK_FILE)
+    if exclusive:
+        # Only writers create it, readers leave the data folder untouched
+        open(lock_path, 'a').close()
+    with open(lock_path, 'rb') as f:
+        if fcntl:
+            fcntl.flock(f, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+        else:
+            # msvcrt has no shared locks, readers lock exclusively too
+            msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+        try:
+            yield
+        finally:
+            if fcntl:
+                fcntl.flock(f, fcntl.LOCK_UN)
+            else:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+def _signature(folder, filename):
+    stat = os.stat(os.path.join(folder, filename))
+    return stat.st_size, stat.st_mtime_ns
+
+def _complete_lines(path):
+    """Yields the lines of a file up to the last newline, an interrupted append can leave a partial one"""
+    with open(path, 'rb') as f:
+        for line in f:
+            if not line.endswith(b'\n'):
+                break
+            yield line
+
+def _read_index(path):
+    """
+    Returns the latest (size, mtime_ns, first row, end row) per archived CSV,
+    the number of committed rows and the byte length of the complete lines.
+    """
+    entries = {}
+    rows = 0
+    length = 0
+    for line in _complete_lines(os.path.join(path, INDEX_FILE)):
+        name, size, mtime, first, end = line.decode('utf-8').rstrip('\n').rsplit(',', 4)
+        entries[name] = (int(size), int(mtime), int(first), int(end))
+        rows = int(end)
+        length += len(line)
+    return entries, rows, length
+
+def _read_teams(path):
+    """Returns the team names and the byte length of the complete lines"""
+    teams = []
+    length = 0
+    for line in _complete_lines(os.path.join(path, TEAMS_FILE)):
+        # JSON keeps names with newlines on one line
+        teams.append(json.loads(line))
+        length += len(line)
+    return teams, length
+
+def _match_number(filename):
+    return int(filename.rsplit('_', 1)[1].split('.')[0])
+
+def _create(path):
+    for column in ['Team'] + COLUMNS:
+        open(_column_path(path, column), 'wb').close()
+    open(os.path.join(path, TEAMS_FILE), 'w', encoding='utf-8').close()
+    # Written last, exists() only sees a complete archive
+    open(os.path.join(path, INDEX_FILE), 'w', encoding='utf-8').close()
+
+def create_archive(folder):
+    """Create an empty archive for a group's data folder"""
+    path = archive_path(folder)
+    os.makedirs(path, exist_ok=True)
+    with _locked(path):
+        _create(path)
+
+def _archivable(df):
+    """Whether every WWCD/PLCT/Kills value read back as an int32, so summing the archive matches the CSV"""
+    for column in COLUMNS:
+        if not pd.api.types.is_integer_dtype(df[column]):
+            return False
+        if len(df) and (df[column].min() < DTYPE_INFO.min or df[column].max() > DTYPE_INFO.max):
+            return False
+    return True
+
+def _append(path, matches):
+    """Appends (csv file name, signature, match DataFrame) triples, lock must be held"""
+    entries, start, length = _read_index(path)
+    teams, teams_length = _read_teams(path)
+    codes = {team: code for code, team in enumerate(teams)}
+    new_teams = []
+    chunks = {column: [] for column in ['Team'] + COLUMNS}
+    lines = []
+    rows = start
+
+    for filename, signature, df in matches:
+        entry = entries.get(filename)
+        if entry is not None and entry[:2] == signature:
+            continue
+        if not _archivable(df):
+            continue
+        df = df.dropna(subset=['Team'])
+        for team in df['Team']:
+            if team not in codes:
+                codes[team] = len(codes)
+                new_teams.append(team)
+        chunks['Team'].append(df['Team'].map(codes).to_numpy())
+        for column in COLUMNS:
+            chunks[column].append(df[column].to_numpy())
+        entries[filename] = (*signature, rows, rows + len(df))
+        lines.append(f"{filename},{signature[0]},{signature[1]},{rows},{rows + len(df)}\n")
+        rows += len(df)
+
+    if not lines:
+        return
+
+    if new_teams:
+        with open(os.path.join(path, TEAMS_FILE), 'r+b') as f:
+            f.truncate(teams_length)
+            f.seek(0, os.SEEK_END)
+            f.write(''.join(f"{json.dumps(team)}\n" for team in new_teams).encode('utf-8'))
+
+    for column, values in chunks.items():
+        with open(_column_path(path, column), 'r+b') as f:
+            # Drop anything left behind by an interrupted append
+            f.truncate(start * DTYPE.itemsize)
+            f.seek(0, os.SEEK_END)
+            np.concatenate(values).astype(DTYPE).tofile(f)
+
+    with open(os.path.join(path, INDEX_FILE), 'r+b') as f:
+        f.truncate(length)
+        f.seek(0, os.SEEK_END)
+        f.write(''.join(lines).encode('utf-8'))
+
+def append_matches(folder, files):
+    """
+    Appends saved match CSVs to the archive, read back from disk.
+    Matches whose CSV is unchanged since it was archived are skipped.
+    """
+    path = archive_path(folder)
+    with _locked(path):
+        _append(path, _read_csvs(folder, files))
+
+def append_match(folder, filename):
+    """Append a single saved match to the archive"""
+    append_matches(folder, [filename])
+
+def _read_csvs(folder, files):
+    """Reads CSVs as (name, signature, DataFrame), stat before read so edits are caught"""
+    matches = []
+    for f in files:
+        signature = _signature(folder, f)
+        matches.append((f, signature, pd.read_csv(os.path.join(folder, f), usecols=['Team'] + COLUMNS)))
+    return matches
+
+def _merge_ranges(ranges):
+    merged = []
+    for first, end in sorted(ranges):
+        if merged and merged[-1][1] == first:
+            merged[-1][1] = end
+        else:
+            merged.append([first, end])
+    return merged
+
+def _sum_ranges(path, rows, ranges, team_count):
+    """Per team row counts and column sums over the given row ranges of the archive"""
+    counts = np.zeros(team_count, dtype=np.int64)
+    sums = {column: np.zeros(team_count, dtype=np.int64) for column in COLUMNS}
+    if not ranges:
+        return counts, sums
+
+    codes = np.memmap(_column_path(path, 'Team'), dtype=DTYPE, mode='r', shape=(rows,))
+    columns = {column: np.memmap(_column_path(path, column), dtype=DTYPE, mode='r', shape=(rows,))
+               for column in COLUMNS}
+
+    for first, end in _merge_ranges(ranges):
+        for i in range(first, end, SUM_CHUNK):
+            j = min(i + SUM_CHUNK, end)
+            counts += np.bincount(codes[i:j], minlength=team_count)
+            for column in COLUMNS:
+                # Exact for any chunk of int32 values, float64 holds integers up to 2**53
+                sums[column] += np.bincount(codes[i:j], weights=columns[column][i:j],
+                                            minlength=team_count).astype(np.int64)
+    return counts, sums
+
+def team_totals(folder, files):
+    """
+    Sums WWCD, PLCT and Kills per team for the matches in `files`.
+    Archived matches are summed from the memory-mapped columns, CSVs that are
+    not archived or changed since are read directly. Does not write to the archive.
+    Returns the same frame as grouping the CSVs by Team.
+    """
+    path = archive_path(folder)
+    with _locked(path, exclusive=False):
+        entries, rows, _ = _read_index(path)
+        teams, _ = _read_teams(path)
+        ranges = []
+        pending = []
+        for f in files:
+            entry = entries.get(f)
+            if entry is not None and entry[:2] == _signature(folder, f):
+                ranges.append(entry[2:])
+            else:
+                pending.append(f)
+        counts, sums = _sum_ranges(path, rows, ranges, len(teams))
+
+    present = counts > 0
+    totals = {'Team': np.array(teams, dtype=object)[present]}
+    for column in COLUMNS:
+        totals[column] = sums[column][present]
+    totals = pd.DataFrame(totals)
+
+    if pending:
+        # Same aggregation as the CSV path, so NaN teams and values are skipped
+        # and a column with NaN stays float
+        pending_matches = pd.concat([pd.read_csv(os.path.join(folder, f), usecols=['Team'] + COLUMNS)
+                                     for f in pending])
+        pending_totals = pending_matches.groupby('Team')[COLUMNS].sum().reset_index()
+        return pd.concat([totals, pending_totals]).groupby('Team')[COLUMNS].sum().reset_index()
+
+    # groupby('Team') orders teams by name
+    return totals.sort_values('Team').reset_index(drop=True)
+
+def migrate(folder, group):
+    """
+    (Re)builds the archive for a group from its match CSVs.
+    Returns the number of matches archived.
+    """
+    files = [f for f in os.listdir(folder) if f.startswith(f'group_{group}_match_') and f.endswith('.csv')]
+    files.sort(key=_match_number)
+
+    path = archive_path(folder)
+    os.makedirs(path, exist_ok=True)
+    with _locked(path):
+        _create(path)
+        for i in range(0, len(files), MIGRATE_CHUNK):
+            _append(path, _read_csvs(folder, files[i:i + MIGRATE_CHUNK]))
+
+    return len(files)
+
+def main():
+    parser = argparse.ArgumentParser(description="Migrate match CSVs into the columnar match archive")
+    parser.add_argument('groups', nargs='*', default=['A', 'B', 'C'], help="Groups to migrate (default: all)")
+    args = parser.parse_args()
+
+    for group in args.groups:
+        folder = f"Group_{group}_Data"
+        if not os.path.exists(folder):
+            print(f"No data folder found for Group {group}.")
+            continue
+        count = migrate(folder, group)
+        print(f"✓ Group {group}: {count} matches archived to {archive_path(folder)}")
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,6 @@
 import pandas as pd
 import os
+import match_archive
 
 # Official BGMI Point System
 POINT_SYSTEM = {1: 10, 2: 6, 3: 5, 4: 4, 5: 3, 6: 2, 7: 1, 8: 1, 9: 0, 10: 0, 11: 0, 12: 0, 13: 0, 14: 0, 15: 0, 16: 0}
@@ -75,6 +76,8 @@ def add_match_data(group):
     df = pd.DataFrame(teams_data)
     filepath = os.path.join(folder, f"group_{group}_match_{match_no}.csv")
     df.to_csv(filepath, index=False)
+    if match_archive.exists(folder):
+        match_archive.append_match(folder, os.path.basename(filepath))
     print(f"\n✓ Match {match_no} for Group {group} saved successfully!")
     print(f"  Saved to: {filepath}\n")
 
@@ -93,15 +96,19 @@ def generate_group_leaderboard(group):
         print(f"No match data available for Group {group}.")
         return None
 
-    # Combine all match data
-    all_matches = pd.concat([pd.read_csv(os.path.join(folder, f)) for f in files])
-    
-    # Aggregate data by Team
-    leaderboard = all_matches.groupby('Team').agg({
-        'WWCD': 'sum',
-        'PLCT': 'sum',
-        'Kills': 'sum'
-    }).reset_index()
+    if match_archive.exists(folder):
+        # Sum straight from the memory-mapped archive columns
+        leaderboard = match_archive.team_totals(folder, files)
+    else:
+        # Combine all match data
+        all_matches = pd.concat([pd.read_csv(os.path.join(folder, f)) for f in files])
+        
+        # Aggregate data by Team
+        leaderboard = all_matches.groupby('Team').agg({
+            'WWCD': 'sum',
+            'PLCT': 'sum',
+            'Kills': 'sum'
+        }).reset_index()
 
     # Calculate Total
     leaderboard['TOTAL'] = leaderboard['PLCT'] + leaderboard['Kills']
@@ -0,0 +1,211 @@
+import os
+import pathlib
+import threading
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import match_archive
+
+GROUP = 'A'
+TEAMS = ["Team X", "Team Y", "Team Z"]
+
+@pytest.fixture
+def folder(tmp_path):
+    path = tmp_path / f"Group_{GROUP}_Data"
+    path.mkdir()
+    return str(path)
+
+def match_frame(kills, teams=TEAMS):
+    rows = []
+    for rank, (team, team_kills) in enumerate(zip(teams, kills), 1):
+        rows.append({'Group': GROUP, 'Team': team, 'Rank': rank, 'Kills': team_kills,
+                     'WWCD': 1 if rank == 1 else 0, 'PLCT': {1: 10, 2: 6, 3: 5}[rank]})
+    return pd.DataFrame(rows)
+
+def save(folder, match_no, kills, teams=TEAMS):
+    """Saves a match the way app.py does, appending it when an archive exists"""
+    filename = f"group_{GROUP}_match_{match_no}.csv"
+    df = match_frame(kills, teams)
+    df.to_csv(os.path.join(folder, filename), index=False)
+    if match_archive.exists(folder):
+        match_archive.append_match(folder, filename)
+    return filename
+
+def match_files(folder):
+    return [f for f in os.listdir(folder) if f.startswith(f'group_{GROUP}_match_') and f.endswith('.csv')]
+
+def csv_totals(folder):
+    files = match_files(folder)
+    all_matches = pd.concat([pd.read_csv(os.path.join(folder, f)) for f in files])
+    return all_matches.groupby('Team').agg({
+        'WWCD': 'sum',
+        'PLCT': 'sum',
+        'Kills': 'sum'
+    }).reset_index()
+
+def assert_matches_csv(folder):
+    pd.testing.assert_frame_equal(match_archive.team_totals(folder, match_files(folder)), csv_totals(folder))
+
+def test_migrate_matches_csv(folder):
+    save(folder, 1, [5, 3, 1])
+    save(folder, 2, [0, 7, 2])
+    assert match_archive.migrate(folder, GROUP) == 2
+    assert_matches_csv(folder)
+
+def test_saved_matches_are_appended(folder):
+    save(folder, 1, [5, 3, 1])
+    match_archive.migrate(folder, GROUP)
+    save(folder, 2, [0, 7, 2])
+    entries, rows, _ = match_archive._read_index(match_archive.archive_path(folder))
+    assert set(entries) == {"group_A_match_1.csv", "group_A_match_2.csv"}
+    assert rows == 6
+    assert_matches_csv(folder)
+
+def test_duplicate_append_is_skipped(folder):
+    filename = save(folder, 1, [5, 3, 1])
+    match_archive.migrate(folder, GROUP)
+    match_archive.append_match(folder, filename)
+    _, rows, _ = match_archive._read_index(match_archive.archive_path(folder))
+    assert rows == 3
+    assert_matches_csv(folder)
+
+def test_edited_csv_is_read_until_rearchived(folder):
+    save(folder, 1, [5, 3, 1])
+    save(folder, 2, [10, 0, 0])
+    match_archive.migrate(folder, GROUP)
+    # Correct match 2 in place without going through the archive
+    match_frame([100, 0, 0]).to_csv(os.path.join(folder, "group_A_match_2.csv"), index=False)
+    assert_matches_csv(folder)
+
+    save(folder, 2, [100, 0, 0])
+    assert_matches_csv(folder)
+
+def test_deleted_match_is_excluded(folder):
+    save(folder, 1, [5, 3, 1])
+    save(folder, 2, [10, 0, 0])
+    match_archive.migrate(folder, GROUP)
+    os.remove(os.path.join(folder, "group_A_match_2.csv"))
+    assert_matches_csv(folder)
+
+def test_resaved_filename_replaces_archived_rows(folder):
+    save(folder, 1, [5, 3, 1])
+    save(folder, 2, [10, 0, 0])
+    match_archive.migrate(folder, GROUP)
+    os.remove(os.path.join(folder, "group_A_match_2.csv"))
+    # app.py numbers the next match len(files) + 1, reusing the deleted name
+    save(folder, 2, [100, 0, 0])
+    totals = match_archive.team_totals(folder, match_files(folder))
+    assert totals.set_index('Team').loc["Team X", 'Kills'] == 105
+    assert_matches_csv(folder)
+
+def test_append_after_interrupted_write(folder):
+    save(folder, 1, [5, 3, 1])
+    match_archive.migrate(folder, GROUP)
+    path = match_archive.archive_path(folder)
+    # Column data and a half index line from a save that never committed
+    for column in ['Team'] + match_archive.COLUMNS:
+        with open(match_archive._column_path(path, column), 'ab') as f:
+            np.full(2, 99, dtype=match_archive.DTYPE).tofile(f)
+    with open(os.path.join(path, match_archive.INDEX_FILE), 'a', encoding='utf-8') as f:
+        f.write("group_A_match_9.csv,12")
+    assert_matches_csv(folder)
+
+    save(folder, 2, [0, 7, 2])
+    entries, rows, _ = match_archive._read_index(path)
+    assert set(entries) == {"group_A_match_1.csv", "group_A_match_2.csv"}
+    assert rows == 6
+    assert os.path.getsize(match_archive._column_path(path, 'Kills')) == 6 * match_archive.DTYPE.itemsize
+    assert_matches_csv(folder)
+
+def test_totals_do_not_write_archive(folder):
+    save(folder, 1, [5, 3, 1])
+    match_archive.migrate(folder, GROUP)
+    match_frame([1, 1, 1]).to_csv(os.path.join(folder, "group_A_match_2.csv"), index=False)
+    archive = pathlib.Path(match_archive.archive_path(folder))
+    before = {f.name: f.read_bytes() for f in archive.iterdir()}
+    assert_matches_csv(folder)
+    assert {f.name: f.read_bytes() for f in archive.iterdir()} == before
+
+def test_totals_do_not_create_lock_file(folder):
+    save(folder, 1, [5, 3, 1])
+    match_archive.migrate(folder, GROUP)
+    os.remove(os.path.join(match_archive.archive_path(folder), match_archive.LOCK_FILE))
+    with pytest.raises(FileNotFoundError):
+        match_archive.team_totals(folder, match_files(folder))
+    assert not os.path.exists(os.path.join(match_archive.archive_path(folder), match_archive.LOCK_FILE))
+
+def test_totals_are_summed_in_chunks(folder, monkeypatch):
+    monkeypatch.setattr(match_archive, 'SUM_CHUNK', 2)
+    for match_no in range(1, 6):
+        save(folder, match_no, [match_no, 2 * match_no, 3])
+    match_archive.migrate(folder, GROUP)
+    assert_matches_csv(folder)
+
+def test_concurrent_saves_and_reads(folder):
+    save(folder, 1, [5, 3, 1])
+    match_archive.migrate(folder, GROUP)
+
+    saved = ["group_A_match_1.csv"]
+    errors = []
+
+    def worker(match_no):
+        try:
+            saved.append(save(folder, match_no, [match_no, 1, 0]))
+            # Only completed saves, a CSV being written is not readable yet
+            match_archive.team_totals(folder, list(saved))
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=worker, args=(match_no,)) for match_no in range(2, 26)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    _, rows, _ = match_archive._read_index(match_archive.archive_path(folder))
+    assert rows == 25 * len(TEAMS)
+    assert_matches_csv(folder)
+
+def test_blank_kills_are_not_archived(folder):
+    save(folder, 1, [1, 1, 1])
+    match_archive.migrate(folder, GROUP)
+    # An empty kills box reaches save_match as None
+    filename = save(folder, 2, [2, None, 0])
+    entries, rows, _ = match_archive._read_index(match_archive.archive_path(folder))
+    assert filename not in entries
+    assert rows == 3
+    totals = match_archive.team_totals(folder, match_files(folder))
+    assert totals.set_index('Team').loc["Team X", 'Kills'] == 3
+    assert_matches_csv(folder)
+
+    match_archive.migrate(folder, GROUP)
+    assert_matches_csv(folder)
+
+def test_blank_kills_in_unarchived_csv(folder):
+    save(folder, 1, [1, 1, 1])
+    match_archive.migrate(folder, GROUP)
+    match_frame([2, None, 0]).to_csv(os.path.join(folder, "group_A_match_2.csv"), index=False)
+    assert_matches_csv(folder)
+
+def test_na_team_names_match_csv(folder):
+    # read_csv turns these names into NaN and groupby drops them
+    teams = ["Foo", "NA", "null"]
+    save(folder, 1, [5, 3, 1], teams)
+    match_archive.migrate(folder, GROUP)
+    save(folder, 2, [2, 2, 2], teams)
+    match_frame([1, 1, 1], teams).to_csv(os.path.join(folder, "group_A_match_3.csv"), index=False)
+    assert list(match_archive.team_totals(folder, match_files(folder))['Team']) == ["Foo"]
+    assert_matches_csv(folder)
+
+def test_team_names_with_newlines(folder):
+    # Names that survive the CSV round trip, each would split a plain text line
+    teams = ["Team\r\nX", "Team\nY", "Team\u2028Z"]
+    save(folder, 1, [5, 3, 1], teams)
+    match_archive.migrate(folder, GROUP)
+    save(folder, 2, [1, 2, 3], teams)
+    teams_read, _ = match_archive._read_teams(match_archive.archive_path(folder))
+    assert teams_read == teams
+    assert_matches_csv(folder)